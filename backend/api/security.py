@@ -29,13 +29,23 @@ def get_current_user(credentials: HTTPAuthorizationCredentials | None = Depends(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=f"Invalid token: {exc}") from exc
 
 
+_role_dependencies: dict[frozenset[str], Callable[[AuthenticatedUser], AuthenticatedUser]] = {}
+
+
 def require_roles(*roles: str) -> Callable[[AuthenticatedUser], AuthenticatedUser]:
+    # Reuse one dependency per role set so FastAPI can dedupe it across routes.
+    allowed = frozenset(roles)
+    cached = _role_dependencies.get(allowed)
+    if cached is not None:
+        return cached
+
     def dependency(user: AuthenticatedUser = Depends(get_current_user)) -> AuthenticatedUser:
-        if user.role not in roles:
+        if user.role not in allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Role '{user.role}' is not authorized. Required one of: {roles}",
             )
         return user
 
+    _role_dependencies[allowed] = dependency
     return dependency
@@ -1,13 +1,24 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from backend.api.routes import router as api_router
+from backend.api.routes import (
+    PREDICT_BATCH_CONCURRENCY,
+    PREDICT_WORKERS,
+    UVICORN_WORKERS,
+    database_service,
+    router as api_router,
+)
 
 logger = logging.getLogger("credishield.api")
 logging.basicConfig(
@@ -15,10 +26,30 @@ logging.basicConfig(
     format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
 )
 
+SHUTDOWN_FLUSH_TIMEOUT_SECONDS = float(os.getenv("SHUTDOWN_FLUSH_TIMEOUT_SECONDS", "30"))
+
+
+@asynccontextmanager
+async def lifespan(application: FastAPI) -> AsyncIterator[None]:
+    # CPU-bound inference is offloaded with asyncio.to_thread; bound it to one
+    # worker per core so concurrent requests don't oversubscribe the CPU.
+    executor = ThreadPoolExecutor(max_workers=PREDICT_WORKERS, thread_name_prefix="predict")
+    asyncio.get_running_loop().set_default_executor(executor)
+    # Created here so the semaphore belongs to the loop actually serving requests.
+    application.state.batch_chunk_slots = asyncio.Semaphore(PREDICT_BATCH_CONCURRENCY)
+    try:
+        yield
+    finally:
+        if not await asyncio.to_thread(database_service.flush_predictions, SHUTDOWN_FLUSH_TIMEOUT_SECONDS):
+            logger.error("Shutting down with queued predictions still unwritten")
+        executor.shutdown(wait=False)
+
+
 app = FastAPI(
     title="CrediShield XAI API",
     version="1.0.0",
     description="Explainable Credit Risk Assessment API with SHAP reason codes and analytics logging.",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -39,8 +70,9 @@ app.include_router(api_router, prefix="/api")
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(_, exc: RequestValidationError) -> JSONResponse:
-    logger.error("Validation error on incoming request: %s", exc.errors())
-    return JSONResponse(status_code=422, content={"detail": exc.errors()})
+    errors = exc.errors()
+    logger.error("Validation error on incoming request: %s", errors)
+    return JSONResponse(status_code=422, content={"detail": errors})
 
 
 @app.get("/")
@@ -52,3 +84,16 @@ def health() -> dict[str, str]:
 @app.get("/api/")
 def health_api() -> dict[str, str]:
     return health()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        "backend.main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=UVICORN_WORKERS,
+        loop="uvloop",
+        http="httptools",
+    )
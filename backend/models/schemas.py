@@ -66,6 +66,7 @@ class AuditLogsResponse(BaseModel):
     limit: int
     offset: int
     count: int
+    next_cursor: int | None = None
     entries: List[AuditLogEntry]
 
 
@@ -154,10 +155,11 @@ class CaseUpdateRequest(BaseModel):
 
 
 class CaseListResponse(BaseModel):
-    total: int
+    total: int | None = None
     limit: int
     offset: int
     count: int
+    next_cursor: int | None = None
     entries: List[CaseRecord]
 
 
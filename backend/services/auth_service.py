@@ -1,13 +1,23 @@
 from __future__ import annotations
 
+import hashlib
 import os
-import json
-from urllib.parse import urlencode
-from urllib.request import urlopen
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Literal
 
 import jwt
+import requests
+from jwt import PyJWKClient, PyJWKClientConnectionError
+from jwt.api_jwt import PyJWT
+from requests.adapters import HTTPAdapter
+
+GOOGLE_JWKS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+GOOGLE_TOKENINFO_URL = "https://oauth2.googleapis.com/tokeninfo"
+GOOGLE_ISSUERS = ["accounts.google.com", "https://accounts.google.com"]
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "10000"))
 
 
 class AuthService:
@@ -15,7 +25,23 @@ class AuthService:
         self.jwt_secret = os.getenv("JWT_SECRET", "change-me-in-production")
         self.jwt_algorithm = os.getenv("JWT_ALGORITHM", "HS256")
         self.jwt_expiry_minutes = int(os.getenv("JWT_EXPIRY_MINUTES", "120"))
+        # Bound once so session encode/decode skip the module-level wrappers.
+        self._jwt = PyJWT()
+        self._jwt_key = self.jwt_secret.encode("utf-8")
+        self._jwt_algorithms = [self.jwt_algorithm]
         self.google_client_id = os.getenv("GOOGLE_CLIENT_ID") or os.getenv("VITE_GOOGLE_CLIENT_ID")
+        # Google rotates its signing keys every few days; unknown `kid`s trigger a refetch.
+        self.google_jwks_client = PyJWKClient(
+            GOOGLE_JWKS_URL,
+            lifespan=int(os.getenv("GOOGLE_JWKS_CACHE_SECONDS", "3600")),
+            timeout=8,
+        )
+        # Keep-alive pool so tokeninfo fallbacks skip the TCP+TLS handshake.
+        self._http = requests.Session()
+        self._http.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=50, max_retries=3))
+        # Verified session claims keyed by sha256(token), so raw tokens are not kept in memory.
+        self._session_cache: OrderedDict[bytes, Dict[str, Any]] = OrderedDict()
+        self._session_cache_lock = threading.Lock()
 
         analyst_emails = os.getenv("ALLOWED_ANALYST_EMAILS", "")
         admin_emails = os.getenv("ALLOWED_ADMIN_EMAILS", "")
@@ -24,38 +50,33 @@ class AuthService:
         self.allowed_analyst_emails = {e.strip().lower() for e in analyst_emails.split(",") if e.strip()}
         self.allowed_admin_emails = {e.strip().lower() for e in admin_emails.split(",") if e.strip()}
         self.allowed_domains = {d.strip().lower() for d in domains.split(",") if d.strip()}
+        # Admins may also sign in as analysts; org domains grant both roles.
+        self._role_emails = {
+            "admin": frozenset(self.allowed_admin_emails),
+            "analyst": frozenset(self.allowed_analyst_emails | self.allowed_admin_emails),
+        }
 
     def _is_role_allowed(self, email: str, role: Literal["end_user", "analyst", "admin"]) -> bool:
-        email_l = email.lower()
-        domain = email_l.split("@")[-1] if "@" in email_l else ""
-
         if role == "end_user":
             return True
 
-        if role == "admin":
-            if email_l in self.allowed_admin_emails:
-                return True
-            if self.allowed_domains and domain in self.allowed_domains:
-                return True
+        allowed_emails = self._role_emails.get(role)
+        if allowed_emails is None:
             return False
 
-        if role == "analyst":
-            if email_l in self.allowed_analyst_emails or email_l in self.allowed_admin_emails:
-                return True
-            if self.allowed_domains and domain in self.allowed_domains:
-                return True
-            return False
-
-        return False
+        email_l = email.lower()
+        _, at, domain = email_l.rpartition("@")
+        return email_l in allowed_emails or (bool(at) and domain in self.allowed_domains)
 
     def verify_google_token_and_role(
         self,
         raw_id_token: str,
         requested_role: Literal["end_user", "analyst", "admin"],
     ) -> Dict[str, Any]:
-        query = urlencode({"id_token": raw_id_token})
-        with urlopen(f"https://oauth2.googleapis.com/tokeninfo?{query}", timeout=8) as response:
-            idinfo = json.loads(response.read().decode("utf-8"))
+        try:
+            idinfo = self._decode_google_id_token(raw_id_token)
+        except PyJWKClientConnectionError:
+            idinfo = self._fetch_google_tokeninfo(raw_id_token)
 
         if self.google_client_id and idinfo.get("aud") != self.google_client_id:
             raise ValueError("Google token audience does not match configured client id")
@@ -78,6 +99,24 @@ class AuthService:
             "tenant_id": "default",
         }
 
+    def _decode_google_id_token(self, raw_id_token: str) -> Dict[str, Any]:
+        """Verify the ID token's RS256 signature locally against Google's cached JWKS."""
+        signing_key = self.google_jwks_client.get_signing_key_from_jwt(raw_id_token)
+        return jwt.decode(
+            raw_id_token,
+            signing_key.key,
+            algorithms=["RS256"],
+            audience=self.google_client_id,
+            issuer=GOOGLE_ISSUERS,
+            options={"verify_aud": bool(self.google_client_id)},
+        )
+
+    def _fetch_google_tokeninfo(self, raw_id_token: str) -> Dict[str, Any]:
+        # Fallback for when the JWKS endpoint is unreachable.
+        response = self._http.get(GOOGLE_TOKENINFO_URL, params={"id_token": raw_id_token}, timeout=8)
+        response.raise_for_status()
+        return response.json()
+
     def issue_session_token(self, user: Dict[str, Any]) -> tuple[str, int]:
         now = datetime.now(timezone.utc)
         exp = now + timedelta(minutes=self.jwt_expiry_minutes)
@@ -93,8 +132,24 @@ class AuthService:
             "exp": int(exp.timestamp()),
         }
 
-        token = jwt.encode(claims, self.jwt_secret, algorithm=self.jwt_algorithm)
+        token = self._jwt.encode(claims, self._jwt_key, algorithm=self.jwt_algorithm)
         return token, int((exp - now).total_seconds())
 
     def decode_session_token(self, token: str) -> Dict[str, Any]:
-        return jwt.decode(token, self.jwt_secret, algorithms=[self.jwt_algorithm])
+        key = hashlib.sha256(token.encode("utf-8")).digest()
+        with self._session_cache_lock:
+            claims = self._session_cache.get(key)
+            if claims is not None:
+                if claims["exp"] > time.time():
+                    self._session_cache.move_to_end(key)
+                    return claims
+                del self._session_cache[key]
+
+        claims = self._jwt.decode(token, self._jwt_key, algorithms=self._jwt_algorithms)
+        # Only successful verifications with an expiry are cached; failures always re-raise.
+        if isinstance(claims.get("exp"), (int, float)):
+            with self._session_cache_lock:
+                self._session_cache[key] = claims
+                if len(self._session_cache) > SESSION_CACHE_SIZE:
+                    self._session_cache.popitem(last=False)
+        return claims
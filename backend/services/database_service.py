@@ -1,100 +1,468 @@
 from __future__ import annotations
 
-import json
+import logging
+import os
+import queue
 import secrets
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from itertools import product
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+import orjson
+
+from backend.services.ttl_cache import TTLCache
 
 DB_PATH = Path("history.db")
+SCHEMA_VERSION = 3
+FAIRNESS_FIELDS = ("personal_status", "foreign_worker")
+READ_CACHE_TTL_SECONDS = float(os.getenv("READ_CACHE_TTL_SECONDS", "10"))
+PREDICTION_FLUSH_INTERVAL_SECONDS = float(os.getenv("PREDICTION_FLUSH_INTERVAL_SECONDS", "0.01"))
+PREDICTION_FLUSH_MAX_BATCH = int(os.getenv("PREDICTION_FLUSH_MAX_BATCH", "128"))
+# How long a read waits for predictions queued before it to be written.
+PREDICTION_READ_FLUSH_TIMEOUT_SECONDS = float(os.getenv("PREDICTION_READ_FLUSH_TIMEOUT_SECONDS", "1.0"))
+PREDICTION_RETRY_INITIAL_DELAY_SECONDS = 0.05
+PREDICTION_RETRY_MAX_DELAY_SECONDS = 2.0
+# Primary result codes a write can recover from by waiting: another connection
+# holds the database, or the disk hit an I/O error or ran out of space.
+_TRANSIENT_SQLITE_ERRORS = frozenset(
+    (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED, sqlite3.SQLITE_IOERR, sqlite3.SQLITE_FULL)
+)
+
+logger = logging.getLogger("credishield.db")
+_JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+# Fixed column order unpacked positionally by `_row_to_case`.
+CASE_COLUMNS = (
+    "id, created_at, updated_at, status, assigned_to, created_by, "
+    "applicant_json, prediction_json, analyst_notes, admin_override_reason"
+)
+
+
+def _where(conditions: Sequence[str], mask: Sequence[bool]) -> str:
+    active = [condition for condition, enabled in zip(conditions, mask, strict=True) if enabled]
+    return f" WHERE {' AND '.join(active)}" if active else ""
+
+
+# The summary upserts materialize the new rows through a primary-key range
+# first, so the planner can't pick an index that walks the whole table to
+# satisfy GROUP BY; each write then costs O(new rows), not O(table).
+_ACCUMULATE_TRENDS_SQL = """
+    WITH fresh AS MATERIALIZED (
+        SELECT timestamp, pd_score FROM predictions WHERE id > ?
+    )
+    INSERT INTO daily_trends (date, prediction_count, pd_sum, high_count)
+    SELECT DATE(timestamp), COUNT(*), SUM(pd_score), SUM(pd_score >= 0.5)
+    FROM fresh
+    WHERE true
+    GROUP BY DATE(timestamp)
+    ON CONFLICT (date) DO UPDATE SET
+        prediction_count = prediction_count + excluded.prediction_count,
+        pd_sum = pd_sum + excluded.pd_sum,
+        high_count = high_count + excluded.high_count
+"""
+# Fused upsert: the new rows are read (and their generated columns extracted)
+# once, then grouped per fairness field and folded into fairness_summary.
+_FAIRNESS_GROUPINGS = " UNION ALL ".join(
+    f"SELECT '{field}', COALESCE({field}, 'unknown'), COUNT(*), SUM(pd_score), SUM(pd_score >= 0.5) "
+    f"FROM fresh GROUP BY {field}"
+    for field in FAIRNESS_FIELDS
+)
+_ACCUMULATE_FAIRNESS_SQL = f"""
+    WITH fresh AS MATERIALIZED (
+        SELECT {", ".join(FAIRNESS_FIELDS)}, pd_score FROM predictions WHERE id > ?
+    )
+    INSERT INTO fairness_summary (field, group_name, count, pd_sum, high_count)
+    SELECT * FROM ({_FAIRNESS_GROUPINGS}) WHERE true
+    ON CONFLICT (field, group_name) DO UPDATE SET
+        count = count + excluded.count,
+        pd_sum = pd_sum + excluded.pd_sum,
+        high_count = high_count + excluded.high_count
+"""
+
+# SQLite 3.45+ can store input_json as JSONB, which json_extract() (the purpose
+# index, the fairness generated columns) reads without re-parsing text. Older
+# rows stay TEXT; the json functions accept both.
+SQLITE_JSONB = sqlite3.sqlite_version_info >= (3, 45, 0)
+_INPUT_JSON_PARAM = "jsonb(?)" if SQLITE_JSONB else "?"
+_INPUT_JSON_COLUMN = "json(input_json) AS input_json" if SQLITE_JSONB else "input_json"
+
+# SQL for every optional-filter combination, built once at import so hot paths
+# only pick a string and SQLite's per-connection statement cache always hits.
+_AUDIT_FILTERS = ("json_extract(input_json, '$.purpose') = ?", "id < ?")
+# Totals ignore the cursor, so counts only take the leading filters.
+_AUDIT_COUNT_FILTERS = _AUDIT_FILTERS[:1]
+_AUDIT_COUNT_SQL = {
+    mask: f"SELECT COUNT(*) FROM predictions{_where(_AUDIT_COUNT_FILTERS, mask)}"
+    for mask in product((False, True), repeat=len(_AUDIT_COUNT_FILTERS))
+}
+_AUDIT_PAGE_SQL = {
+    mask: (
+        f"SELECT id, timestamp, {_INPUT_JSON_COLUMN}, pd_score, model_version FROM predictions"
+        f"{_where(_AUDIT_FILTERS, mask)} ORDER BY id DESC LIMIT ? OFFSET ?"
+    )
+    for mask in product((False, True), repeat=len(_AUDIT_FILTERS))
+}
+_CASE_FILTERS = ("status = ?", "assigned_to = ?", "id < ?")
+_CASE_COUNT_FILTERS = _CASE_FILTERS[:2]
+_CASE_COUNT_SQL = {
+    mask: f"SELECT COUNT(*) FROM cases{_where(_CASE_COUNT_FILTERS, mask)}"
+    for mask in product((False, True), repeat=len(_CASE_COUNT_FILTERS))
+}
+_CASE_PAGE_SQL = {
+    mask: f"SELECT {CASE_COLUMNS} FROM cases{_where(_CASE_FILTERS, mask)} ORDER BY id DESC LIMIT ? OFFSET ?"
+    for mask in product((False, True), repeat=len(_CASE_FILTERS))
+}
+
+_iso_second: Tuple[int, str] = (-1, "")
+
+
+def _utc_iso(timestamp: float | None = None) -> str:
+    """Format a Unix time like `datetime.isoformat()` in UTC, reusing the per-second prefix.
+
+    Microseconds are always written, so the result has a fixed width and
+    still round-trips through `datetime.fromisoformat`.
+    """
+    global _iso_second
+    if timestamp is None:
+        timestamp = time.time()
+    second = int(timestamp)
+    cached = _iso_second
+    if cached[0] != second:
+        cached = (second, time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second)))
+        _iso_second = cached
+    return f"{cached[1]}.{int((timestamp - second) * 1_000_000):06d}+00:00"
+
+
+def _is_transient_sqlite_error(exc: BaseException) -> bool:
+    code = getattr(exc, "sqlite_errorcode", None)
+    return isinstance(exc, sqlite3.Error) and code is not None and code & 0xFF in _TRANSIENT_SQLITE_ERRORS
+
+
+def _dumps(value: Any) -> str:
+    # Stored as TEXT (not BLOB) so json_extract() and the generated columns keep working.
+    return orjson.dumps(value, option=_JSON_OPTIONS).decode("utf-8")
 
 
 class DatabaseService:
+    _initialized_paths: set[str] = set()
+
     def __init__(self, db_path: Path = DB_PATH) -> None:
         self.db_path = db_path
+        # Dashboard aggregates only change when predictions are logged.
+        self.read_cache = TTLCache(ttl_seconds=READ_CACHE_TTL_SECONDS)
+        self._local = threading.local()
+        # Single predictions are written behind by one thread in small batches.
+        self._pending_predictions: queue.Queue[Tuple[Dict[str, Any] | str, Dict[str, Any], str]] = queue.Queue()
+        self._writer: threading.Thread | None = None
+        self._writer_lock = threading.Lock()
+        # Sequence counters let a flush wait only for what was queued before it.
+        self._queued_count = 0
+        self._written_count = 0
+        self._written_changed = threading.Condition()
         self._initialize()
 
     def _connect(self) -> sqlite3.Connection:
-        return sqlite3.connect(self.db_path)
+        """Return this thread's connection, opening and tuning it on first use.
+
+        Connections run in autocommit mode, so plain reads never hold a
+        transaction open; writes go through `_transaction()`.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA cache_size=-20000")
+            conn.execute("PRAGMA mmap_size=268435456")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a block of writes as one IMMEDIATE transaction on the pooled connection."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            # A failed COMMIT (e.g. SQLITE_BUSY) leaves the transaction open.
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
 
     def _initialize(self) -> None:
-        with self._connect() as conn:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS predictions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT NOT NULL,
-                    input_json TEXT NOT NULL,
-                    pd_score REAL NOT NULL,
-                    model_version TEXT NOT NULL DEFAULT '1.0.0',
-                    top_risk_increasing_json TEXT NOT NULL,
-                    top_risk_decreasing_json TEXT NOT NULL
+        """Bring the schema up to SCHEMA_VERSION once per process and database file."""
+        key = str(Path(self.db_path).resolve())
+        if key in DatabaseService._initialized_paths:
+            return
+
+        with self._transaction() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if row is None or int(row[0]) < SCHEMA_VERSION:
+                self._migrate_schema(conn)
+                conn.execute(
+                    """
+                    INSERT INTO meta (key, value) VALUES ('schema_version', ?)
+                    ON CONFLICT (key) DO UPDATE SET value = excluded.value
+                    """,
+                    (str(SCHEMA_VERSION),),
                 )
-                """
+        DatabaseService._initialized_paths.add(key)
+
+    def _migrate_schema(self, conn: sqlite3.Connection) -> None:
+        # Idempotent; bump SCHEMA_VERSION whenever this changes so existing databases rerun it.
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS predictions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT NOT NULL,
+                input_json TEXT NOT NULL,
+                pd_score REAL NOT NULL,
+                model_version TEXT NOT NULL DEFAULT '1.0.0',
+                top_risk_increasing_json TEXT NOT NULL,
+                top_risk_decreasing_json TEXT NOT NULL
             )
-            columns = {row[1] for row in conn.execute("PRAGMA table_info(predictions)").fetchall()}
-            if "model_version" not in columns:
-                conn.execute("ALTER TABLE predictions ADD COLUMN model_version TEXT NOT NULL DEFAULT '1.0.0'")
-
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS cases (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    created_at TEXT NOT NULL,
-                    updated_at TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    assigned_to TEXT,
-                    created_by TEXT NOT NULL,
-                    applicant_json TEXT NOT NULL,
-                    prediction_json TEXT,
-                    analyst_notes TEXT,
-                    admin_override_reason TEXT
+            """
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(predictions)").fetchall()}
+        if "model_version" not in columns:
+            conn.execute("ALTER TABLE predictions ADD COLUMN model_version TEXT NOT NULL DEFAULT '1.0.0'")
+        columns = {row[1] for row in conn.execute("PRAGMA table_xinfo(predictions)").fetchall()}
+        for field in FAIRNESS_FIELDS:
+            if field not in columns:
+                conn.execute(
+                    f"ALTER TABLE predictions ADD COLUMN {field} TEXT "
+                    f"GENERATED ALWAYS AS (json_extract(input_json, '$.{field}')) VIRTUAL"
                 )
-                """
+            # Fairness reads come from fairness_summary now; the per-field
+            # index only slowed inserts.
+            conn.execute(f"DROP INDEX IF EXISTS idx_predictions_{field}")
+        # Likewise trends read daily_trends, and this index made the planner
+        # scan the whole table for the incremental id > ? summary queries.
+        conn.execute("DROP INDEX IF EXISTS idx_predictions_date")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_predictions_purpose "
+            "ON predictions(json_extract(input_json, '$.purpose'))"
+        )
+
+        has_summaries = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'daily_trends'"
+        ).fetchone()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS daily_trends (
+                date TEXT PRIMARY KEY,
+                prediction_count INTEGER NOT NULL,
+                pd_sum REAL NOT NULL,
+                high_count INTEGER NOT NULL
             )
-
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS reports (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    case_id INTEGER NOT NULL,
-                    created_at TEXT NOT NULL,
-                    created_by TEXT NOT NULL,
-                    title TEXT NOT NULL,
-                    report_json TEXT NOT NULL,
-                    FOREIGN KEY(case_id) REFERENCES cases(id)
-                )
-                """
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS fairness_summary (
+                field TEXT NOT NULL,
+                group_name TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                pd_sum REAL NOT NULL,
+                high_count INTEGER NOT NULL,
+                PRIMARY KEY (field, group_name)
             )
-
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS report_share_links (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    report_id INTEGER NOT NULL,
-                    token TEXT NOT NULL UNIQUE,
-                    created_at TEXT NOT NULL,
-                    created_by TEXT NOT NULL,
-                    expires_at TEXT NOT NULL,
-                    revoked INTEGER NOT NULL DEFAULT 0,
-                    FOREIGN KEY(report_id) REFERENCES reports(id)
-                )
-                """
+            """
+        )
+        if not has_summaries:
+            self._accumulate_summaries(conn, after_id=0)
+
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cases (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                status TEXT NOT NULL,
+                assigned_to TEXT,
+                created_by TEXT NOT NULL,
+                applicant_json TEXT NOT NULL,
+                prediction_json TEXT,
+                analyst_notes TEXT,
+                admin_override_reason TEXT
+            )
+            """
+        )
+        # One index per list_cases filter combination so each page is a range
+        # seek already in id order rather than a scan plus sort.
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cases_status_id ON cases(status, id DESC)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cases_assigned_id ON cases(assigned_to, id DESC)")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cases_status_assigned_id ON cases(status, assigned_to, id DESC)"
+        )
+
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS reports (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                case_id INTEGER NOT NULL,
+                created_at TEXT NOT NULL,
+                created_by TEXT NOT NULL,
+                title TEXT NOT NULL,
+                report_json TEXT NOT NULL,
+                FOREIGN KEY(case_id) REFERENCES cases(id)
             )
-            conn.commit()
+            """
+        )
+
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS report_share_links (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                report_id INTEGER NOT NULL,
+                token TEXT NOT NULL UNIQUE,
+                created_at TEXT NOT NULL,
+                created_by TEXT NOT NULL,
+                expires_at TEXT NOT NULL,
+                revoked INTEGER NOT NULL DEFAULT 0,
+                FOREIGN KEY(report_id) REFERENCES reports(id)
+            )
+            """
+        )
 
     def log_prediction(
         self,
-        model_input: Dict[str, Any],
+        model_input: Dict[str, Any] | str,
         model_output: Dict[str, Any],
         model_version: str = "1.0.0",
     ) -> None:
-        now_iso = datetime.now(timezone.utc).isoformat()
+        """Queue one prediction; the background writer commits it within ~10 ms."""
+        self._ensure_writer()
+        with self._written_changed:
+            self._queued_count += 1
+        self._pending_predictions.put((model_input, model_output, model_version))
+
+    def flush_predictions(self, timeout: float | None = None) -> bool:
+        """Wait until every prediction queued before this call has been written.
+
+        Predictions queued while waiting are not waited for. Returns False if
+        `timeout` seconds pass first.
+        """
+        with self._written_changed:
+            target = self._queued_count
+            return self._written_changed.wait_for(lambda: self._written_count >= target, timeout)
+
+    def flush_for_read(self) -> None:
+        """Give dashboard reads read-your-writes: wait (bounded) for earlier predictions."""
+        if not self.flush_predictions(timeout=PREDICTION_READ_FLUSH_TIMEOUT_SECONDS):
+            logger.warning("Reading before queued predictions were written")
+
+    def _ensure_writer(self) -> None:
+        if self._writer is not None:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_pending_predictions,
+                    name="prediction-writer",
+                    daemon=True,
+                )
+                self._writer.start()
+
+    def _write_pending_predictions(self) -> None:
+        while True:
+            batch = [self._pending_predictions.get()]
+            deadline = time.monotonic() + PREDICTION_FLUSH_INTERVAL_SECONDS
+            while len(batch) < PREDICTION_FLUSH_MAX_BATCH:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._pending_predictions.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            by_version: Dict[str, List[Tuple[Dict[str, Any] | str, Dict[str, Any]]]] = {}
+            for model_input, model_output, model_version in batch:
+                by_version.setdefault(model_version, []).append((model_input, model_output))
+            for model_version, records in by_version.items():
+                self._store_with_retry(records, model_version)
+
+            with self._written_changed:
+                self._written_count += len(batch)
+                self._written_changed.notify_all()
+
+    def _store_with_retry(
+        self,
+        records: List[Tuple[Dict[str, Any] | str, Dict[str, Any]]],
+        model_version: str,
+    ) -> None:
+        """Write queued records, retrying until they are stored.
+
+        The requests behind these records have already returned, so transient
+        database errors (busy, locked, disk I/O or full) are retried with
+        backoff instead of dropping the audit trail. Any other error, including
+        sqlite constraint or malformed-JSON errors, can come from a record
+        itself; the records are then written one by one so only a record that
+        cannot be stored on its own is lost.
+        """
+        delay = PREDICTION_RETRY_INITIAL_DELAY_SECONDS
+        while True:
+            try:
+                self.log_predictions_bulk(records, model_version=model_version)
+                return
+            except Exception as exc:
+                if _is_transient_sqlite_error(exc):
+                    logger.warning(
+                        "Failed to write %d queued predictions (%s); retrying in %.2fs", len(records), exc, delay
+                    )
+                    time.sleep(delay)
+                    delay = min(delay * 2, PREDICTION_RETRY_MAX_DELAY_SECONDS)
+                    continue
+                if len(records) == 1:
+                    logger.exception("Dropping a queued prediction that cannot be written")
+                    return
+                for record in records:
+                    self._store_with_retry([record], model_version)
+                return
+
+    def log_predictions_bulk(
+        self,
+        records: List[Tuple[Dict[str, Any] | str, Dict[str, Any]]],
+        model_version: str = "1.0.0",
+    ) -> None:
+        """Insert many (input, output) prediction pairs in a single transaction.
+
+        Inputs may be passed pre-serialized (e.g. `model_dump_json()`) to skip
+        re-encoding the request payload.
+        """
+        if not records:
+            return
+
+        now_iso = _utc_iso()
+        rows = [
+            (
+                now_iso,
+                model_input if isinstance(model_input, str) else _dumps(model_input),
+                float(model_output["probability_of_default"]),
+                model_version,
+                _dumps(model_output["top_risk_increasing"]),
+                _dumps(model_output["top_risk_decreasing"]),
+            )
+            for model_input, model_output in records
+        ]
 
-        with self._connect() as conn:
-            conn.execute(
-                """
+        with self._transaction() as conn:
+            last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM predictions").fetchone()[0]
+            conn.executemany(
+                f"""
                 INSERT INTO predictions (
                     timestamp,
                     input_json,
@@ -102,49 +470,28 @@ class DatabaseService:
                     model_version,
                     top_risk_increasing_json,
                     top_risk_decreasing_json
-                ) VALUES (?, ?, ?, ?, ?, ?)
+                ) VALUES (?, {_INPUT_JSON_PARAM}, ?, ?, ?, ?)
                 """,
-                (
-                    now_iso,
-                    json.dumps(model_input),
-                    float(model_output["probability_of_default"]),
-                    model_version,
-                    json.dumps(model_output["top_risk_increasing"]),
-                    json.dumps(model_output["top_risk_decreasing"]),
-                ),
+                rows,
             )
-            conn.commit()
+            self._accumulate_summaries(conn, after_id=last_id)
+
+        self.read_cache.clear()
+
+    @staticmethod
+    def _accumulate_summaries(conn: sqlite3.Connection, after_id: int) -> None:
+        """Fold predictions with id > `after_id` into the daily and fairness summaries."""
+        conn.execute(_ACCUMULATE_TRENDS_SQL, (after_id,))
+        conn.execute(_ACCUMULATE_FAIRNESS_SQL, (after_id,))
 
     def fetch_audit_logs(
         self,
         limit: int = 100,
         offset: int = 0,
         purpose: str | None = None,
+        cursor: int | None = None,
     ) -> Dict[str, Any]:
-        where_clause = ""
-        params: List[Any] = []
-        if purpose:
-            where_clause = " WHERE json_extract(input_json, '$.purpose') = ?"
-            params.append(purpose)
-
-        with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
-            total_row = conn.execute(
-                f"SELECT COUNT(*) AS c FROM predictions{where_clause}",
-                tuple(params),
-            ).fetchone()
-            total = int(total_row["c"]) if total_row else 0
-
-            rows = conn.execute(
-                f"""
-                SELECT id, timestamp, input_json, pd_score, model_version
-                FROM predictions
-                {where_clause}
-                ORDER BY id DESC
-                LIMIT ? OFFSET ?
-                """,
-                tuple([*params, limit, offset]),
-            ).fetchall()
+        total, rows = self.fetch_audit_log_rows(limit=limit, offset=offset, purpose=purpose, cursor=cursor)
 
         entries = [
             {
@@ -152,7 +499,7 @@ class DatabaseService:
                 "timestamp": row["timestamp"],
                 "pd_score": float(row["pd_score"]),
                 "model_version": row["model_version"] or "1.0.0",
-                "input_payload": json.loads(row["input_json"]),
+                "input_payload": orjson.loads(row["input_json"]),
             }
             for row in rows
         ]
@@ -162,76 +509,104 @@ class DatabaseService:
             "limit": int(limit),
             "offset": int(offset),
             "count": len(entries),
+            "next_cursor": self.next_cursor(rows, limit),
             "entries": entries,
         }
 
+    def fetch_audit_log_rows(
+        self,
+        limit: int = 100,
+        offset: int = 0,
+        purpose: str | None = None,
+        cursor: int | None = None,
+    ) -> Tuple[int, List[sqlite3.Row]]:
+        """Return the match count and raw audit rows with `input_json` left encoded.
+
+        When `cursor` (the last id seen) is given, the page starts just below it
+        via the primary key and `offset` is ignored, so deep pages cost O(limit).
+        """
+        self.flush_for_read()
+        filters = [purpose] if purpose else []
+        total = self.read_cache.get_or_set(
+            ("audit_total", purpose),
+            lambda: self._count_predictions(_AUDIT_COUNT_SQL[(bool(purpose),)], filters),
+        )
+
+        if cursor is not None:
+            offset = 0
+        params = [*filters, *([cursor] if cursor is not None else []), limit, offset]
+        with self._connect() as conn:
+            rows = conn.execute(_AUDIT_PAGE_SQL[(bool(purpose), cursor is not None)], params).fetchall()
+
+        return total, rows
+
+    @staticmethod
+    def next_cursor(rows: Sequence[Sequence[Any]], limit: int) -> int | None:
+        # Every paged query selects `id` first.
+        return int(rows[-1][0]) if rows and len(rows) == limit else None
+
+    def _count_predictions(self, sql: str, params: List[Any]) -> int:
+        with self._connect() as conn:
+            return int(conn.execute(sql, params).fetchone()[0])
+
+    def fetch_recent_pd_scores(self, limit: int = 500) -> np.ndarray:
+        """Return the most recent PD scores, newest first, without payloads."""
+        self.flush_for_read()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT pd_score FROM predictions ORDER BY id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+
+        return np.fromiter((row[0] for row in rows), dtype=np.float64, count=len(rows))
+
     def fetch_fairness_metrics(self) -> Dict[str, Any]:
+        self.flush_for_read()
+        return self.read_cache.get_or_set("fairness", self._query_fairness_metrics)
+
+    def _query_fairness_metrics(self) -> Dict[str, Any]:
         with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
+            total = conn.execute("SELECT COALESCE(SUM(prediction_count), 0) FROM daily_trends").fetchone()[0]
             rows = conn.execute(
                 """
-                SELECT input_json, pd_score
-                FROM predictions
-                ORDER BY id DESC
+                SELECT field, group_name, count, pd_sum, high_count
+                FROM fairness_summary
+                ORDER BY count DESC
                 """
             ).fetchall()
 
-        parsed = [
-            {
-                "input": json.loads(row["input_json"]),
-                "pd_score": float(row["pd_score"]),
-            }
-            for row in rows
-        ]
-
-        def aggregate_by(field: str) -> List[Dict[str, Any]]:
-            buckets: Dict[str, Dict[str, Any]] = {}
-            for item in parsed:
-                key = str(item["input"].get(field, "unknown"))
-                if key not in buckets:
-                    buckets[key] = {"count": 0, "pd_sum": 0.0, "high": 0}
-                buckets[key]["count"] += 1
-                buckets[key]["pd_sum"] += item["pd_score"]
-                if item["pd_score"] >= 0.5:
-                    buckets[key]["high"] += 1
-
-            result: List[Dict[str, Any]] = []
-            for group, metrics in buckets.items():
-                count = metrics["count"]
-                result.append(
-                    {
-                        "group": group,
-                        "count": int(count),
-                        "avg_pd": float(metrics["pd_sum"] / count) if count else 0.0,
-                        "high_risk_rate": float(metrics["high"] / count) if count else 0.0,
-                    }
-                )
-            return sorted(result, key=lambda x: x["count"], reverse=True)
+        by_field: Dict[str, List[Dict[str, Any]]] = {field: [] for field in FAIRNESS_FIELDS}
+        for row in rows:
+            count = int(row["count"])
+            by_field[row["field"]].append(
+                {
+                    "group": row["group_name"],
+                    "count": count,
+                    "avg_pd": float(row["pd_sum"]) / count,
+                    "high_risk_rate": float(row["high_count"]) / count,
+                }
+            )
 
         return {
-            "overall_count": len(parsed),
-            "by_personal_status": aggregate_by("personal_status"),
-            "by_foreign_worker": aggregate_by("foreign_worker"),
+            "overall_count": int(total),
+            "by_personal_status": by_field["personal_status"],
+            "by_foreign_worker": by_field["foreign_worker"],
         }
 
     def fetch_trends(self) -> Dict[str, Any]:
-        with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
+        self.flush_for_read()
+        return self.read_cache.get_or_set("trends", self._query_trends)
 
-            total = conn.execute("SELECT COUNT(*) AS c FROM predictions").fetchone()["c"]
-            latest_row = conn.execute("SELECT MAX(timestamp) AS latest FROM predictions").fetchone()
-            last_prediction_at = latest_row["latest"] if latest_row else None
+    def _query_trends(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            latest_row = conn.execute("SELECT timestamp FROM predictions ORDER BY id DESC LIMIT 1").fetchone()
+            last_prediction_at = latest_row["timestamp"] if latest_row else None
 
             trend_rows = conn.execute(
                 """
-                SELECT
-                    DATE(timestamp) AS date,
-                    COUNT(*) AS prediction_count,
-                    AVG(pd_score) AS avg_pd,
-                    AVG(CASE WHEN pd_score >= 0.5 THEN 1.0 ELSE 0.0 END) AS high_risk_rate
-                FROM predictions
-                GROUP BY DATE(timestamp)
-                ORDER BY DATE(timestamp) ASC
+                SELECT date, prediction_count, pd_sum, high_count
+                FROM daily_trends
+                ORDER BY date ASC
                 """
             ).fetchall()
 
@@ -239,14 +614,14 @@ class DatabaseService:
             {
                 "date": row["date"],
                 "prediction_count": int(row["prediction_count"]),
-                "avg_pd": float(row["avg_pd"]),
-                "high_risk_rate": float(row["high_risk_rate"]),
+                "avg_pd": float(row["pd_sum"]) / row["prediction_count"],
+                "high_risk_rate": float(row["high_count"]) / row["prediction_count"],
             }
             for row in trend_rows
         ]
 
         return {
-            "total_predictions": int(total),
+            "total_predictions": sum(point["prediction_count"] for point in trends),
             "last_prediction_at": last_prediction_at,
             "trends": trends,
         }
@@ -259,8 +634,8 @@ class DatabaseService:
         assigned_to: str | None = None,
         analyst_notes: str | None = None,
     ) -> Dict[str, Any]:
-        now_iso = datetime.now(timezone.utc).isoformat()
-        with self._connect() as conn:
+        now_iso = _utc_iso()
+        with self._transaction() as conn:
             cur = conn.execute(
                 """
                 INSERT INTO cases (
@@ -281,13 +656,12 @@ class DatabaseService:
                     "new",
                     assigned_to,
                     created_by,
-                    json.dumps(applicant_payload),
-                    json.dumps(prediction_payload) if prediction_payload is not None else None,
+                    _dumps(applicant_payload),
+                    _dumps(prediction_payload) if prediction_payload is not None else None,
                     analyst_notes,
                     None,
                 ),
             )
-            conn.commit()
             case_id = cur.lastrowid
 
         return self.get_case(case_id)
@@ -298,36 +672,29 @@ class DatabaseService:
         offset: int = 0,
         status_filter: str | None = None,
         assigned_to: str | None = None,
+        cursor: int | None = None,
+        include_total: bool = False,
     ) -> Dict[str, Any]:
-        where_parts: List[str] = []
-        params: List[Any] = []
-
-        if status_filter:
-            where_parts.append("status = ?")
-            params.append(status_filter)
-        if assigned_to:
-            where_parts.append("assigned_to = ?")
-            params.append(assigned_to)
+        """Return a page of cases, newest first.
 
-        where_clause = f" WHERE {' AND '.join(where_parts)}" if where_parts else ""
+        Pass the previous page's `next_cursor` as `cursor` to seek by primary key
+        instead of scanning past `offset` rows. The COUNT(*) behind `total` is
+        only run when `include_total` is set.
+        """
+        filters = [value for value in (status_filter, assigned_to) if value]
+        filter_mask = (bool(status_filter), bool(assigned_to))
 
         with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
-            total_row = conn.execute(
-                f"SELECT COUNT(*) AS c FROM cases{where_clause}",
-                tuple(params),
-            ).fetchone()
-            total = int(total_row["c"]) if total_row else 0
-
-            rows = conn.execute(
-                f"""
-                SELECT *
-                FROM cases
-                {where_clause}
-                ORDER BY id DESC
-                LIMIT ? OFFSET ?
-                """,
-                tuple([*params, limit, offset]),
+            total = None
+            if include_total:
+                total = int(conn.execute(_CASE_COUNT_SQL[filter_mask], filters).fetchone()[0])
+
+            if cursor is not None:
+                offset = 0
+            params = [*filters, *([cursor] if cursor is not None else []), limit, offset]
+            rows = self._tuple_cursor(conn).execute(
+                _CASE_PAGE_SQL[(*filter_mask, cursor is not None)],
+                params,
             ).fetchall()
 
         entries = [self._row_to_case(r) for r in rows]
@@ -336,13 +703,16 @@ class DatabaseService:
             "limit": int(limit),
             "offset": int(offset),
             "count": len(entries),
+            "next_cursor": self.next_cursor(rows, limit),
             "entries": entries,
         }
 
     def get_case(self, case_id: int) -> Dict[str, Any]:
         with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
-            row = conn.execute("SELECT * FROM cases WHERE id = ?", (case_id,)).fetchone()
+            row = self._tuple_cursor(conn).execute(
+                f"SELECT {CASE_COLUMNS} FROM cases WHERE id = ?",
+                (case_id,),
+            ).fetchone()
 
         if row is None:
             raise ValueError(f"Case {case_id} not found")
@@ -359,38 +729,57 @@ class DatabaseService:
                 params.append(value)
 
         set_parts.append("updated_at = ?")
-        params.append(datetime.now(timezone.utc).isoformat())
+        params.append(_utc_iso())
         params.append(case_id)
 
         if len(set_parts) == 1:
             return self.get_case(case_id)
 
-        with self._connect() as conn:
+        with self._transaction() as conn:
             conn.execute(
                 f"UPDATE cases SET {', '.join(set_parts)} WHERE id = ?",
                 tuple(params),
             )
-            conn.commit()
 
         return self.get_case(case_id)
 
-    def _row_to_case(self, row: sqlite3.Row) -> Dict[str, Any]:
+    @staticmethod
+    def _tuple_cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+        # Plain tuples skip sqlite3.Row construction and name lookups.
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        return cursor
+
+    @staticmethod
+    def _row_to_case(row: Tuple[Any, ...]) -> Dict[str, Any]:
+        (
+            case_id,
+            created_at,
+            updated_at,
+            status,
+            assigned_to,
+            created_by,
+            applicant_json,
+            prediction_json,
+            analyst_notes,
+            admin_override_reason,
+        ) = row
         return {
-            "id": int(row["id"]),
-            "created_at": row["created_at"],
-            "updated_at": row["updated_at"],
-            "status": row["status"],
-            "assigned_to": row["assigned_to"],
-            "created_by": row["created_by"],
-            "applicant_payload": json.loads(row["applicant_json"]),
-            "prediction_payload": json.loads(row["prediction_json"]) if row["prediction_json"] else None,
-            "analyst_notes": row["analyst_notes"],
-            "admin_override_reason": row["admin_override_reason"],
+            "id": case_id,
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "status": status,
+            "assigned_to": assigned_to,
+            "created_by": created_by,
+            "applicant_payload": orjson.loads(applicant_json),
+            "prediction_payload": orjson.loads(prediction_json) if prediction_json else None,
+            "analyst_notes": analyst_notes,
+            "admin_override_reason": admin_override_reason,
         }
 
     def create_report_for_case(self, case_id: int, created_by: str, title: str) -> Dict[str, Any]:
         case = self.get_case(case_id)
-        now_iso = datetime.now(timezone.utc).isoformat()
+        now_iso = _utc_iso()
         report_payload = {
             "case": case,
             "summary": {
@@ -401,22 +790,20 @@ class DatabaseService:
             },
         }
 
-        with self._connect() as conn:
+        with self._transaction() as conn:
             cur = conn.execute(
                 """
                 INSERT INTO reports (case_id, created_at, created_by, title, report_json)
                 VALUES (?, ?, ?, ?, ?)
                 """,
-                (case_id, now_iso, created_by, title, json.dumps(report_payload)),
+                (case_id, now_iso, created_by, title, _dumps(report_payload)),
             )
-            conn.commit()
             report_id = cur.lastrowid
 
         return self.get_report(report_id)
 
     def get_report(self, report_id: int) -> Dict[str, Any]:
         with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
             row = conn.execute("SELECT * FROM reports WHERE id = ?", (report_id,)).fetchone()
 
         if row is None:
@@ -428,12 +815,11 @@ class DatabaseService:
             "created_at": row["created_at"],
             "created_by": row["created_by"],
             "title": row["title"],
-            "report_payload": json.loads(row["report_json"]),
+            "report_payload": orjson.loads(row["report_json"]),
         }
 
     def list_reports(self, case_id: int, limit: int = 50, offset: int = 0) -> Dict[str, Any]:
         with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
             total_row = conn.execute("SELECT COUNT(*) AS c FROM reports WHERE case_id = ?", (case_id,)).fetchone()
             total = int(total_row["c"]) if total_row else 0
             rows = conn.execute(
@@ -453,7 +839,7 @@ class DatabaseService:
                 "created_at": row["created_at"],
                 "created_by": row["created_by"],
                 "title": row["title"],
-                "report_payload": json.loads(row["report_json"]),
+                "report_payload": orjson.loads(row["report_json"]),
             }
             for row in rows
         ]
@@ -467,20 +853,18 @@ class DatabaseService:
 
     def create_report_share_link(self, report_id: int, created_by: str, ttl_minutes: int = 60) -> Dict[str, Any]:
         self.get_report(report_id)
-        now = datetime.now(timezone.utc)
-        expires_at = now.timestamp() + (ttl_minutes * 60)
-        expires_iso = datetime.fromtimestamp(expires_at, tz=timezone.utc).isoformat()
+        now = time.time()
+        expires_iso = _utc_iso(now + ttl_minutes * 60)
         token = secrets.token_urlsafe(24)
 
-        with self._connect() as conn:
+        with self._transaction() as conn:
             conn.execute(
                 """
                 INSERT INTO report_share_links (report_id, token, created_at, created_by, expires_at, revoked)
                 VALUES (?, ?, ?, ?, ?, 0)
                 """,
-                (report_id, token, now.isoformat(), created_by, expires_iso),
+                (report_id, token, _utc_iso(now), created_by, expires_iso),
             )
-            conn.commit()
 
         return {
             "report_id": report_id,
@@ -490,7 +874,6 @@ class DatabaseService:
 
     def resolve_report_share_token(self, token: str) -> Dict[str, Any]:
         with self._connect() as conn:
-            conn.row_factory = sqlite3.Row
             row = conn.execute(
                 """
                 SELECT report_id, expires_at, revoked
@@ -1,22 +1,40 @@
 from __future__ import annotations
 
+import os
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List
 
-from model_trainer import ARTIFACT_PATH, get_explanation, get_training_schema, load_bundle
+from pydantic import BaseModel
+
+from backend.services.ttl_cache import TTLCache
+from model_trainer import ARTIFACT_PATH, get_explanation, get_explanations, get_training_schema, load_bundle
 
 
 class PredictionService:
     def __init__(self) -> None:
         # Warm model + preprocessing artifacts on startup
-        load_bundle()
+        bundle = load_bundle()
+        # Predictions run concurrently on the API thread pool, so each call uses
+        # a single XGBoost thread instead of fanning out across every core.
+        bundle["booster"].set_param({"nthread": int(os.getenv("MODEL_N_JOBS", "1"))})
         self.model_version = "1.0.0"
+        self._registry_cache = TTLCache(ttl_seconds=float(os.getenv("READ_CACHE_TTL_SECONDS", "10")), maxsize=1)
 
     def predict_with_reason_codes(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         return get_explanation(payload)
 
+    def predict_from_model(self, payload: BaseModel) -> Dict[str, Any]:
+        # Pydantic v2 keeps validated field values in __dict__; skip the model_dump copy.
+        return get_explanation(payload.__dict__)
+
+    def predict_batch_with_reason_codes(self, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return get_explanations(payloads)
+
     def get_model_registry_info(self) -> Dict[str, Any]:
+        return self._registry_cache.get_or_set("registry", self._build_model_registry_info)
+
+    def _build_model_registry_info(self) -> Dict[str, Any]:
         artifact = Path(ARTIFACT_PATH)
         trained_at = None
         if artifact.exists():
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class TTLCache:
+    """Thread-safe memo of loader results that expire after `ttl_seconds`.
+
+    `clear()` bumps a generation counter so a load that started before an
+    invalidation never repopulates the cache with pre-write data.
+    """
+
+    def __init__(self, ttl_seconds: float, maxsize: int = 128) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+            generation = self._generation
+
+        value = loader()
+
+        with self._lock:
+            if generation == self._generation:
+                self._store(key, value, now)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def _store(self, key: Hashable, value: Any, now: float) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        if key not in self._entries and len(self._entries) >= self.maxsize:
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (now + self.ttl_seconds, value)
@@ -0,0 +1,53 @@
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+from backend.models.schemas import AuditLogsResponse
+from backend.services.database_service import DatabaseService
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture(scope="module")
+def routes(tmp_path_factory):
+    # Importing the router builds its services against ./history.db and
+    # ./models, so do it from a scratch directory that shares the artifact.
+    workdir = tmp_path_factory.mktemp("api")
+    (workdir / "models").symlink_to(REPO_ROOT / "models")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        import backend.api.routes as routes_module
+    finally:
+        os.chdir(cwd)
+    return routes_module
+
+
+async def _collect(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
+
+def test_streamed_audit_logs_match_response_model(routes, tmp_path):
+    service = DatabaseService(tmp_path / "history.db")
+    output = {"probability_of_default": 0.25, "top_risk_increasing": [], "top_risk_decreasing": []}
+    service.log_predictions_bulk(
+        [({"purpose": "radio/tv", "age": 30 + i}, dict(output, probability_of_default=i / 10)) for i in range(5)]
+    )
+    with service._transaction() as conn:
+        # Rows written before timestamps carried a fixed-width fraction.
+        conn.execute("UPDATE predictions SET timestamp = '2024-05-01T10:00:00+00:00' WHERE id = 1")
+        conn.execute("UPDATE predictions SET timestamp = '2024-05-01T10:00:00.000000+00:00' WHERE id = 2")
+
+    total, rows = service.fetch_audit_log_rows(limit=10)
+    streamed = asyncio.run(
+        _collect(
+            routes._stream_audit_logs(
+                total=total, limit=10, offset=0, next_cursor=service.next_cursor(rows, 10), rows=rows
+            )
+        )
+    )
+
+    expected = AuditLogsResponse.model_validate(service.fetch_audit_logs(limit=10)).model_dump_json()
+    assert streamed.decode() == expected
@@ -0,0 +1,102 @@
+import sqlite3
+import threading
+
+from backend.services.database_service import DatabaseService
+
+OUTPUT = {"probability_of_default": 0.4, "top_risk_increasing": [], "top_risk_decreasing": []}
+
+
+class _SignallingCondition(threading.Condition):
+    """Condition that reports when a flush has captured its target and starts waiting."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.waiting = threading.Event()
+
+    def wait_for(self, predicate, timeout=None):
+        self.waiting.set()
+        return super().wait_for(predicate, timeout)
+
+
+def _stored_count(service: DatabaseService) -> int:
+    return service._connect().execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+
+def test_failed_write_is_retried_until_stored(tmp_path):
+    service = DatabaseService(tmp_path / "history.db")
+    real_bulk = service.log_predictions_bulk
+    failures = {"left": 2}
+
+    def flaky_bulk(records, model_version="1.0.0"):
+        if failures["left"]:
+            failures["left"] -= 1
+            exc = sqlite3.OperationalError("database is locked")
+            exc.sqlite_errorcode = sqlite3.SQLITE_BUSY
+            exc.sqlite_errorname = "SQLITE_BUSY"
+            raise exc
+        real_bulk(records, model_version=model_version)
+
+    service.log_predictions_bulk = flaky_bulk
+    for age in (25, 35, 45):
+        service.log_prediction({"age": age, "purpose": "education"}, OUTPUT)
+
+    assert service.flush_predictions(timeout=10)
+    assert failures["left"] == 0
+    assert _stored_count(service) == 3
+
+
+def test_record_rejected_by_sqlite_is_dropped_not_retried(tmp_path):
+    service = DatabaseService(tmp_path / "history.db")
+    # NaN binds as NULL, which the pd_score NOT NULL constraint rejects.
+    service.log_prediction({"age": 30}, {**OUTPUT, "probability_of_default": float("nan")})
+    service.log_prediction({"age": 31}, OUTPUT)
+
+    assert service.flush_predictions(timeout=10)
+    assert _stored_count(service) == 1
+
+
+def test_unwritable_record_does_not_drop_its_batch(tmp_path):
+    service = DatabaseService(tmp_path / "history.db")
+    service.log_prediction({"age": 30}, OUTPUT)
+    service.log_prediction({"age": 31}, {**OUTPUT, "top_risk_increasing": object()})
+    service.log_prediction({"age": 32}, OUTPUT)
+
+    assert service.flush_predictions(timeout=10)
+    assert _stored_count(service) == 2
+
+
+def test_flush_waits_only_for_earlier_predictions(tmp_path):
+    service = DatabaseService(tmp_path / "history.db")
+    real_bulk = service.log_predictions_bulk
+    entered = {40: threading.Event(), 41: threading.Event()}
+    release = {40: threading.Event(), 41: threading.Event()}
+    service._written_changed = condition = _SignallingCondition()
+
+    def blocking_bulk(records, model_version="1.0.0"):
+        age = records[0][0]["age"]
+        entered[age].set()
+        assert release[age].wait(timeout=10)
+        real_bulk(records, model_version=model_version)
+
+    service.log_predictions_bulk = blocking_bulk
+    service.log_prediction({"age": 40}, OUTPUT)
+    assert entered[40].wait(timeout=10)
+    assert not service.flush_predictions(timeout=0.05)
+
+    flushed = []
+    condition.waiting.clear()
+    reader = threading.Thread(target=lambda: flushed.append(service.flush_predictions(timeout=10)))
+    reader.start()
+    # Queue the next prediction only once the reader has captured its target.
+    assert condition.waiting.wait(timeout=10)
+    service.log_prediction({"age": 41}, OUTPUT)
+    release[40].set()
+    reader.join(timeout=10)
+
+    # The reader only waited for the prediction queued before it.
+    assert flushed == [True]
+    assert _stored_count(service) == 1
+
+    release[41].set()
+    assert service.flush_predictions(timeout=10)
+    assert _stored_count(service) == 2
@@ -0,0 +1,38 @@
+import pytest
+
+from backend.services import database_service
+from backend.services.database_service import DatabaseService
+
+OUTPUT = {"probability_of_default": 0.7, "top_risk_increasing": [], "top_risk_decreasing": []}
+
+
+@pytest.mark.parametrize("sql", [database_service._ACCUMULATE_TRENDS_SQL, database_service._ACCUMULATE_FAIRNESS_SQL])
+def test_accumulation_reads_only_new_rows(tmp_path, sql):
+    service = DatabaseService(tmp_path / "history.db")
+    conn = service._connect()
+    # Databases from before the index cleanup still carry the old date index,
+    # which is what used to turn these upserts into full scans.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_predictions_date ON predictions(DATE(timestamp), pd_score)")
+    service.log_predictions_bulk([({"personal_status": "single", "foreign_worker": "yes"}, OUTPUT)] * 50)
+    conn.execute("ANALYZE")
+
+    plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", (25,)).fetchall()]
+    prediction_steps = [step for step in plan if "predictions" in step]
+    assert prediction_steps
+    for step in prediction_steps:
+        assert step.startswith("SEARCH predictions USING INTEGER PRIMARY KEY"), plan
+
+
+def test_accumulated_summaries_match_the_log(tmp_path):
+    service = DatabaseService(tmp_path / "history.db")
+    service.log_predictions_bulk([({"personal_status": "single", "foreign_worker": "yes"}, OUTPUT)] * 3)
+    service.log_predictions_bulk([({"personal_status": "married", "foreign_worker": "no"}, {**OUTPUT, "probability_of_default": 0.2})])
+
+    trends = service.fetch_trends()
+    assert trends["total_predictions"] == 4
+    assert trends["trends"][0]["prediction_count"] == 4
+    assert trends["trends"][0]["high_risk_rate"] == 0.75
+
+    fairness = service.fetch_fairness_metrics()
+    assert fairness["overall_count"] == 4
+    assert {group["group"]: group["count"] for group in fairness["by_personal_status"]} == {"single": 3, "married": 1}